@@ -1,8 +1,10 @@
+from concurrent.futures import ThreadPoolExecutor
+
 import streamlit as st
 import pandas as pd
-import plotly.graph_objects as go
 import numpy as np
-from scipy import interpolate
+
+import kla_core
 
 st.set_page_config(layout="wide")
 
@@ -28,69 +30,59 @@ df_input = st.data_editor(
     key="kla_input_table"
 )
 
+smooth = st.checkbox(
+    "Smooth surface",
+    value=True,
+    help="Cubic interpolation onto a regular grid. Uncheck to draw the raw triangulated data instead."
+)
+
+# --- Validate and extract data on every rerun (non-numeric or blank cells become NaN) ---
+df_kla = df_input.apply(pd.to_numeric, errors="coerce")
+data_is_numeric = not df_kla.isna().to_numpy().any()
+data_is_plottable = data_is_numeric and df_kla.shape[0] >= 3
+
+if data_is_plottable:
+    # Extract columns (single precision is plenty for plotting); the (x, y)
+    # pairs come out as one (N, 2) array, ready for the triangulation
+    points = df_kla[["Agitation (RPM)", "Gas Flow (SLPM)"]].to_numpy(dtype=np.float32)
+    Z_data = df_kla["kLa (h⁻¹)"].to_numpy(dtype=np.float32)
+
+    # Start triangulating new points in the background while the user is still
+    # editing, on a worker owned by this session so sessions never queue behind
+    # each other
+    points_fp = kla_core.fingerprint(points)
+    if st.session_state.get("kla_tri_fp") != points_fp:
+        if "kla_executor" not in st.session_state:
+            st.session_state["kla_executor"] = ThreadPoolExecutor(max_workers=1)
+        st.session_state["kla_tri_future"] = kla_core.prefetch_triangulation(
+            st.session_state["kla_executor"],
+            points,
+            previous=st.session_state.get("kla_tri_future")
+        )
+        st.session_state["kla_tri_fp"] = points_fp
+
 # --- Generate Plot Button ---
 if st.button("Generate 3D Plot"):
-    # Validate numeric data
-    try:
-        df_kla = df_input.astype(float)
-    except Exception:
+    if not data_is_numeric:
         st.error("All entries must be numeric. Please correct the data.")
         st.stop()
 
-    if df_kla.shape[0] < 3:
+    if not data_is_plottable:
         st.warning("Please provide at least three data points for interpolation.")
         st.stop()
 
-    # Extract columns
-    X_data = df_kla["Agitation (RPM)"].to_numpy()
-    Y_data = df_kla["Gas Flow (SLPM)"].to_numpy()
-    Z_data = df_kla["kLa (h⁻¹)"].to_numpy()
-
-    # --- Interpolate onto a grid ---
-    grid_res = 50
-    xi = np.linspace(X_data.min(), X_data.max(), grid_res)
-    yi = np.linspace(Y_data.min(), Y_data.max(), grid_res)
-    Xi, Yi = np.meshgrid(xi, yi)
-    Zi = interpolate.griddata((X_data, Y_data), Z_data, (Xi, Yi), method='cubic')
-    Zi[np.isnan(Zi)] = 0
-
-    # --- Create 3D surface and scatter plot ---
-    surface_trace = go.Surface(
-        x=Xi,
-        y=Yi,
-        z=Zi,
-        colorscale='Viridis',
-        opacity=0.9,
-        contours_z=dict(show=True, usecolormap=True, project_z=True),
-        name="Interpolated Surface"
-    )
-
-    scatter_trace = go.Scatter3d(
-        x=X_data,
-        y=Y_data,
-        z=Z_data,
-        mode="markers",
-        marker=dict(size=5, color="red", opacity=1.0),
-        name="Data Points"
-    )
-
-    fig = go.Figure(data=[surface_trace, scatter_trace])
-    fig.update_layout(
-        scene=dict(
-            xaxis_title="Agitation (RPM)",
-            yaxis_title="Gas Flow (SLPM)",
-            zaxis_title="kLa (h⁻¹)",
-            xaxis=dict(showgrid=True, gridcolor="lightgrey"),
-            yaxis=dict(showgrid=True, gridcolor="lightgrey"),
-            zaxis=dict(showgrid=True, gridcolor="lightgrey"),
-        ),
-        title_text="kLa (h⁻¹) vs. Agitation (RPM) and Gas Flow (SLPM)",
-        showlegend=True,
-        height=700
-    )
+    # --- Interpolate and build the figure, reusing the last one if unchanged ---
+    fig_key = (kla_core.fingerprint(points, Z_data), smooth)
+    if st.session_state.get("kla_fig_key") == fig_key and "kla_fig" in st.session_state:
+        fig = st.session_state["kla_fig"]
+    else:
+        tri = st.session_state["kla_tri_future"].result()
+        fig = kla_core.make_figure(points, Z_data, tri, smooth=smooth)
+        st.session_state["kla_fig"] = fig
+        st.session_state["kla_fig_key"] = fig_key
 
     # --- Display Plot ---
-    st.plotly_chart(fig, use_container_width=True)
+    st.plotly_chart(fig, width="content")
     st.success("Interactive 3D plot generated! You can rotate, zoom, and pan with your mouse.")
 
 else:
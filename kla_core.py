@@ -0,0 +1,141 @@
+"""Cached interpolation and plotting pipeline for the kLa 3D visualizer.
+
+scipy and plotly are imported inside the functions that use them so the
+input page renders without paying for those imports up front.
+"""
+import hashlib
+from concurrent.futures import Future, ThreadPoolExecutor
+
+import streamlit as st
+import numpy as np
+
+# Cap on raw data points drawn as markers; the surface always uses every point
+MAX_SCATTER_POINTS = 2000
+
+# Cap on cached surfaces/figures, which are shared by every session for the life
+# of the process
+MAX_CACHE_ENTRIES = 32
+
+
+def fingerprint(*arrays: np.ndarray) -> bytes:
+    """Short, session-stable digest of the given data arrays."""
+    h = hashlib.blake2b(digest_size=8)
+    for a in arrays:
+        h.update(a.tobytes())
+    return h.digest()
+
+
+def prefetch_triangulation(executor: ThreadPoolExecutor, points: np.ndarray,
+                           previous: Future | None = None) -> Future:
+    """Start triangulating the (N, 2) points on the session's executor.
+
+    previous, the session's last prefetch, is cancelled first so a queued
+    triangulation of stale points never delays this one. The returned future's
+    result can be passed to make_figure as _tri.
+    """
+    if previous is not None:
+        previous.cancel()
+    return executor.submit(_delaunay, points)
+
+
+def _delaunay(points: np.ndarray):
+    from scipy.spatial import Delaunay
+
+    return Delaunay(points)
+
+
+# --- Cached computation helpers ---
+@st.cache_data(show_spinner=False, max_entries=MAX_CACHE_ENTRIES)
+def compute_surface(points: np.ndarray, z: np.ndarray, _tri, grid_res: int = 50):
+    """Interpolate the scattered kLa points onto a regular grid_res x grid_res mesh.
+
+    _tri is the Delaunay triangulation of points from prefetch_triangulation;
+    the underscore keeps Streamlit from hashing it.
+    """
+    from scipy.interpolate import CloughTocher2DInterpolator
+
+    # Column-wise bounds of the data in one min and one max reduction
+    lo, hi = points.min(axis=0), points.max(axis=0)
+    xi = np.linspace(lo[0], hi[0], grid_res, dtype=np.float32)
+    yi = np.linspace(lo[1], hi[1], grid_res, dtype=np.float32)
+    # Fill the rectilinear query grid in place by broadcasting the two axes,
+    # so there is no meshgrid or restacking copy.
+    query = np.empty((grid_res, grid_res, 2), dtype=np.float32)
+    query[..., 0] = xi
+    query[..., 1] = yi[:, None]
+    # Points outside the convex hull of the data are filled with 0
+    interp = CloughTocher2DInterpolator(_tri, z, fill_value=0.0)
+    Zi = interp(query).astype(np.float32)
+    # Zi rows follow yi and columns follow xi, as go.Surface expects for 1D axes
+    return xi, yi, Zi
+
+
+@st.cache_resource(show_spinner=False, max_entries=MAX_CACHE_ENTRIES)
+def make_figure(points: np.ndarray, z: np.ndarray, _tri, grid_res: int = 50, smooth: bool = True):
+    """Build the surface + scatter figure for the given data.
+
+    _tri is the Delaunay triangulation of points from prefetch_triangulation
+    (not hashed). With smooth=False the surface is drawn directly from its
+    triangles, skipping the interpolation grid entirely.
+    """
+    import plotly.graph_objects as go
+
+    # --- Create 3D surface and scatter plot ---
+    if smooth:
+        xi, yi, Zi = compute_surface(points, z, _tri, grid_res)
+        surface_trace = go.Surface(
+            x=xi,
+            y=yi,
+            z=Zi,
+            colorscale='Viridis',
+            opacity=0.9,
+            contours_z=dict(show=True, usecolormap=True, project_z=True),
+            name="Interpolated Surface"
+        )
+    else:
+        simplices = _tri.simplices
+        surface_trace = go.Mesh3d(
+            x=points[:, 0],
+            y=points[:, 1],
+            z=z,
+            i=simplices[:, 0],
+            j=simplices[:, 1],
+            k=simplices[:, 2],
+            intensity=z,
+            colorscale='Viridis',
+            opacity=0.9,
+            name="Triangulated Surface",
+            showlegend=True
+        )
+
+    # Subsample large datasets so the marker payload stays small
+    scatter_points, scatter_z = points, z
+    if len(z) > MAX_SCATTER_POINTS:
+        idx = np.random.default_rng(0).choice(len(z), MAX_SCATTER_POINTS, replace=False)
+        scatter_points, scatter_z = points[idx], z[idx]
+
+    scatter_trace = go.Scatter3d(
+        x=scatter_points[:, 0],
+        y=scatter_points[:, 1],
+        z=scatter_z,
+        mode="markers",
+        marker=dict(size=5, color="red", opacity=1.0),
+        name="Data Points"
+    )
+
+    fig = go.Figure(data=[surface_trace, scatter_trace])
+    fig.update_layout(
+        scene=dict(
+            xaxis_title="Agitation (RPM)",
+            yaxis_title="Gas Flow (SLPM)",
+            zaxis_title="kLa (h⁻¹)",
+            xaxis=dict(showgrid=True, gridcolor="lightgrey"),
+            yaxis=dict(showgrid=True, gridcolor="lightgrey"),
+            zaxis=dict(showgrid=True, gridcolor="lightgrey"),
+        ),
+        title_text="kLa (h⁻¹) vs. Agitation (RPM) and Gas Flow (SLPM)",
+        showlegend=True,
+        width=1100,
+        height=700
+    )
+    return fig